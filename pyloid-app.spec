@@ -1,4 +1,5 @@
 # -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_submodules
 
 
 a = Analysis(
@@ -6,7 +7,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('./src-pyloid/icons/', './src-pyloid/icons/'), ('./dist-front/', './dist-front/')],
-    hiddenimports=[],
+    hiddenimports=collect_submodules('uvicorn'),
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -16,19 +17,17 @@ a = Analysis(
 )
 pyz = PYZ(a.pure)
 
+# Onedir layout: the bundle is loaded in place instead of being unpacked to a temp dir on every launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [('O', None, 'OPTION'), ('O', None, 'OPTION')],
+    exclude_binaries=True,
     name='pyloid-app',
     debug=False,
     bootloader_ignore_signals=False,
     strip=True,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -37,3 +36,12 @@ exe = EXE(
     entitlements_file=None,
     icon=['src-pyloid\\icons\\icon.ico'],
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=True,
+    upx=True,
+    upx_exclude=[],
+    name='pyloid-app',
+)
@@ -0,0 +1,12 @@
+from pyloid_adapter.base_adapter import BaseAdapter
+
+def start(host: str, port: int):
+    # Import the server on the backend thread so FastAPI, uvicorn and httpx load after the window is up
+    from server import start as start_server
+    start_server(host, port)
+
+def setup_cors():
+    # CORS is configured by server.py itself once it is imported
+    pass
+
+adapter = BaseAdapter(start, setup_cors)
@@ -1,3 +1,4 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
@@ -6,20 +7,35 @@ import os
 class Settings(BaseSettings):
     github_token: Optional[str] = None
     github_org: str = ""
+    # uvicorn log level; set BACKEND_LOG_LEVEL=info to see server logs while debugging
+    backend_log_level: str = "warning"
+    # Enable ?profile=1 on any endpoint (needs pyinstrument); set PROFILING=true
+    profiling: bool = False
+
+    @field_validator("backend_log_level")
+    @classmethod
+    def lowercase_log_level(cls, value: str) -> str:
+        # uvicorn only knows lowercase level names, so accept BACKEND_LOG_LEVEL=INFO too
+        return value.lower()
 
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
         # Allow extra fields and don't validate .env existence
         extra = 'ignore'
+        # Settings are read once at import and never mutated
+        frozen = True
 
 
 # Only try to load .env if it exists
 # Try both possible .env locations
-env_path = os.path.join(os.path.dirname(__file__), '.env')
-if os.path.exists(env_path):
-    settings = Settings(_env_file=env_path)
-elif os.path.exists('.env'):
+ENV_PATH = os.path.join(os.path.dirname(__file__), '.env')
+if os.path.isfile(ENV_PATH):
+    settings = Settings(_env_file=ENV_PATH)
+elif os.path.isfile('.env'):
     settings = Settings(_env_file='.env')
 else:
     settings = Settings()
+
+# Fallback token for requests that don't send X-GitHub-Token
+DEFAULT_TOKEN = settings.github_token or None
@@ -1,180 +1,437 @@
+import asyncio
+import random
+import time
 import httpx
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
 from config import settings
 
+DEFAULT_API_URL = "https://api.github.com"
+
+# Cache lifetimes (seconds) for per-repository resources
+CACHE_TTL_SHORT = 30    # workflow runs, runners, pull requests, issues
+CACHE_TTL_NORMAL = 60   # branches
+CACHE_TTL_LONG = 300    # workflow definitions
+
+# Number of items per collection shown in the tree; list endpoints fetch no more than this
+TREE_LIMIT = 20
+# Issues share their endpoint with pull requests, so over-fetch a little to survive the filtering
+ISSUES_FETCH_LIMIT = 30
+
+# Retry policy for transient GitHub failures and rate limiting
+MAX_RETRIES = 5
+RETRY_STATUSES = (429, 502, 503, 504)
+# Total time a request may spend waiting between attempts before the failure is returned
+MAX_RETRY_TIME = 45
+
+# Entries kept in the per-client TTL and ETag caches before the oldest are dropped
+MAX_CACHE_ENTRIES = 1024
+
+# Pull requests and issues for one repository in a single GraphQL round trip
+# (branches stay on REST: GraphQL only shows branch protection rules to admins)
+REPO_BUNDLE_QUERY = """
+query($owner: String!, $name: String!, $first: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: $first, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes { databaseId number title state url createdAt updatedAt isDraft }
+    }
+    issues(first: $first, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes { databaseId number title state url createdAt updatedAt }
+    }
+  }
+}
+"""
+
+
+def _remember(store: Dict[Any, Any], key: Any, value: Any) -> None:
+    """Store a cache entry, dropping the oldest ones once MAX_CACHE_ENTRIES is reached"""
+    store.pop(key, None)
+    while len(store) >= MAX_CACHE_ENTRIES:
+        del store[next(iter(store))]
+    store[key] = value
+
+
+def _section(result: Any) -> List[Dict[str, Any]]:
+    """Items of one gathered section; a section GitHub refused to serve is empty"""
+    if isinstance(result, httpx.HTTPStatusError):
+        return []
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def _nodes(repository: Dict[str, Any], field: str) -> List[Dict[str, Any]]:
+    """Nodes of a GraphQL connection on a repository, which may come back null"""
+    return (repository.get(field) or {}).get("nodes") or []
+
+
+def _is_issue(item: Dict[str, Any]) -> bool:
+    """Tell real issues apart from pull requests returned by the issues endpoint"""
+    return item.get("pull_request") is None
+
 
 class GitHubClient:
     def __init__(self, token: Optional[str] = None, api_url: Optional[str] = None):
         self.token = token or settings.github_token
-        self.base_url = api_url or "https://api.github.com"
+        self.base_url = api_url or DEFAULT_API_URL
+        # GitHub Enterprise serves REST under /api/v3 and GraphQL under /api/graphql
+        if self.base_url.endswith("/v3"):
+            self.graphql_url = self.base_url[:-len("v3")] + "graphql"
+        else:
+            self.graphql_url = f"{self.base_url}/graphql"
+        self.repos_url = f"{self.base_url}/repos"
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28"
         }
-        self.client = httpx.AsyncClient(headers=self.headers, timeout=30.0)
+        # HTTP/2 multiplexes the concurrent per-repo calls over one TLS connection
+        # (the transport also retries failed connection attempts)
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            # Fail fast on unreachable hosts while still allowing slow responses
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=30)
+            )
+        )
+        # Cap in-flight requests to stay under GitHub's secondary rate limits
+        # (created on first use, inside the event loop that serves the requests)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # (endpoint, owner, repo, ...) -> (fetched_at, value)
+        self._cache: Dict[Tuple[Any, ...], Tuple[float, Any]] = {}
+        # (url, params) -> (etag, parsed body, links) for conditional requests
+        self._etags: Dict[Tuple[Any, ...], Tuple[str, Any, Dict[str, Dict[str, str]]]] = {}
+        # (url, params) -> GET currently in flight, shared by identical concurrent requests
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Future] = {}
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying with exponential backoff on 5xx and rate limiting
+
+        The concurrency slot is released while waiting between attempts. A wait that
+        would run past MAX_RETRY_TIME returns the failed response instead.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(20)
+        deadline = time.monotonic() + MAX_RETRY_TIME
+        for attempt in range(MAX_RETRIES + 1):
+            async with self._semaphore:
+                response = await self.client.request(method, url, **kwargs)
+
+            retry_after = response.headers.get("Retry-After")
+            exhausted = response.headers.get("X-RateLimit-Remaining") == "0"
+            retryable = response.status_code in RETRY_STATUSES or (
+                response.status_code == 403 and (retry_after is not None or exhausted)
+            )
+            if not retryable or attempt == MAX_RETRIES:
+                return response
+
+            reset = response.headers.get("X-RateLimit-Reset")
+            if retry_after is not None and retry_after.isdigit():
+                delay = int(retry_after)
+            elif exhausted and reset is not None and reset.isdigit():
+                # The quota only comes back at the reset time
+                delay = max(0, int(reset) - time.time())
+            else:
+                delay = 2 ** attempt + random.uniform(0, 1)
+            if time.monotonic() + delay > deadline:
+                return response
+            await asyncio.sleep(delay)
+        return response
+
+    async def _get(
+        self, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+        """Issue a conditional GET request and return the parsed body and Link header
+
+        Raises httpx.HTTPStatusError for unsuccessful responses. Identical GETs issued
+        while one is already in flight (e.g. overlapping tree refreshes) wait for that
+        request instead of sending their own.
+        """
+        key = (url, tuple(sorted(params.items())) if params else ())
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._conditional_get(url, params, key))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller going away doesn't cancel the request for the others
+        return await asyncio.shield(inflight)
+
+    async def _conditional_get(
+        self, url: str, params: Optional[Dict[str, Any]], key: Tuple[Any, ...]
+    ) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+        """Send a GET with If-None-Match
+
+        Bodies carrying an ETag are remembered; a later 304 Not Modified (which
+        GitHub does not count against the rate limit) is answered from that copy.
+        """
+        cached = self._etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        response = await self._send("GET", url, params=params, headers=headers)
+
+        if response.status_code == 304 and cached:
+            return cached[1], cached[2]
+
+        response.raise_for_status()
+        data, links = orjson.loads(response.content), response.links
+        etag = response.headers.get("ETag")
+        if etag:
+            _remember(self._etags, key, (etag, data, links))
+        return data, links
+
+    async def _post(self, url: str, payload: Dict[str, Any]) -> httpx.Response:
+        """Issue a JSON POST request"""
+        return await self._send(
+            "POST", url, content=orjson.dumps(payload), headers={"Content-Type": "application/json"}
+        )
 
     async def get_rate_limit(self) -> Dict[str, Any]:
         """Get current GitHub API rate limit status"""
-        response = await self.client.get(f"{self.base_url}/rate_limit")
-        response.raise_for_status()
-        return response.json()
+        data, _ = await self._get(f"{self.base_url}/rate_limit")
+        return data
 
     async def get_user_orgs(self) -> List[Dict[str, Any]]:
         """Get all organizations for the authenticated user"""
-        response = await self.client.get(f"{self.base_url}/user/orgs")
-        response.raise_for_status()
-        return response.json()
+        data, _ = await self._get(f"{self.base_url}/user/orgs")
+        return data
 
-    async def get_org_repos(self, org: str) -> List[Dict[str, Any]]:
-        """Get all repositories for an organization or user"""
-        repos = []
-        page = 1
-        per_page = 100
+    async def _get_paginated(self, url: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fetch every page of a list endpoint, requesting pages 2..N concurrently"""
+        data, links = await self._get(url, params={**params, "page": 1})
+        # Copy, since the parsed page is shared with the ETag cache
+        items = list(data)
 
-        # Try organization endpoint first
-        try:
-            while True:
-                response = await self.client.get(
-                    f"{self.base_url}/orgs/{org}/repos",
-                    params={"page": page, "per_page": per_page, "sort": "updated"}
-                )
-                response.raise_for_status()
-                data = response.json()
+        last_url = links.get("last", {}).get("url")
+        if last_url:
+            # GitHub advertises the final page number, so remaining pages can be issued at once
+            last_page = int(httpx.URL(last_url).params.get("page", 1))
+            pages = await asyncio.gather(*(
+                self._get(url, params={**params, "page": page})
+                for page in range(2, last_page + 1)
+            ))
+            for page_data, _ in pages:
+                items.extend(page_data)
+            return items
 
-                if not data:
-                    break
+        # No last page advertised: follow rel="next" until GitHub stops sending it
+        next_url = links.get("next", {}).get("url")
+        while next_url:
+            # The next URL already carries the query parameters
+            data, links = await self._get(next_url)
+            items.extend(data)
+            next_url = links.get("next", {}).get("url")
 
-                repos.extend(data)
-                page += 1
+        return items
 
-                if len(data) < per_page:
-                    break
+    async def get_org_repos(self, org: str) -> List[Dict[str, Any]]:
+        """Get all repositories for an organization or user"""
+        params = {"per_page": 100, "sort": "updated"}
 
-            return repos
+        # Try organization endpoint first
+        try:
+            return await self._get_paginated(f"{self.base_url}/orgs/{org}/repos", params)
         except httpx.HTTPStatusError as e:
             # If org endpoint fails (404), try user endpoint
             if e.response.status_code == 404:
-                page = 1
-                while True:
-                    response = await self.client.get(
-                        f"{self.base_url}/users/{org}/repos",
-                        params={"page": page, "per_page": per_page, "sort": "updated"}
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-
-                    if not data:
-                        break
-
-                    repos.extend(data)
-                    page += 1
-
-                    if len(data) < per_page:
-                        break
-
-                return repos
+                return await self._get_paginated(f"{self.base_url}/users/{org}/repos", params)
             else:
                 raise
 
     async def get_user_repos(self) -> List[Dict[str, Any]]:
         """Get all repositories for the authenticated user"""
-        repos = []
-        page = 1
-        per_page = 100
-
-        while True:
-            response = await self.client.get(
-                f"{self.base_url}/user/repos",
-                params={"page": page, "per_page": per_page, "sort": "updated", "affiliation": "owner"}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data:
-                break
-
-            repos.extend(data)
-            page += 1
+        return await self._get_paginated(
+            f"{self.base_url}/user/repos",
+            {"per_page": 100, "sort": "updated", "affiliation": "owner"}
+        )
 
-            if len(data) < per_page:
-                break
+    async def _cached(
+        self,
+        ttl: float,
+        key: Tuple[Any, ...],
+        fetch: Callable[[], Awaitable[Any]],
+        no_cache: bool = False
+    ) -> Any:
+        """Return a cached value younger than ttl seconds, otherwise fetch and store it"""
+        now = time.monotonic()
+        if not no_cache:
+            entry = self._cache.get(key)
+            if entry and now - entry[0] < ttl:
+                return entry[1]
 
-        return repos
+        value = await fetch()
+        _remember(self._cache, key, (now, value))
+        return value
 
-    async def get_workflows(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+    async def get_workflows(self, owner: str, repo: str, no_cache: bool = False) -> List[Dict[str, Any]]:
         """Get all workflows for a repository"""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/actions/workflows"
-            )
-            response.raise_for_status()
-            return response.json().get("workflows", [])
-        except httpx.HTTPStatusError:
-            return []
+        return await self._cached(
+            CACHE_TTL_LONG, ("workflows", owner, repo),
+            lambda: self._fetch_workflows(owner, repo), no_cache
+        )
+
+    async def _fetch_workflows(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+        data, _ = await self._get(
+            f"{self.repos_url}/{owner}/{repo}/actions/workflows",
+            params={"per_page": TREE_LIMIT}
+        )
+        return data.get("workflows", [])
 
-    async def get_workflow_runs(self, owner: str, repo: str, per_page: int = 10) -> List[Dict[str, Any]]:
+    async def get_workflow_runs(
+        self, owner: str, repo: str, per_page: int = 10, no_cache: bool = False
+    ) -> List[Dict[str, Any]]:
         """Get recent workflow runs for a repository"""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/actions/runs",
-                params={"per_page": per_page, "status": "completed"}
-            )
-            response.raise_for_status()
-            return response.json().get("workflow_runs", [])
-        except httpx.HTTPStatusError:
-            return []
+        return await self._cached(
+            CACHE_TTL_SHORT, ("workflow_runs", owner, repo, per_page),
+            lambda: self._fetch_workflow_runs(owner, repo, per_page), no_cache
+        )
+
+    async def _fetch_workflow_runs(self, owner: str, repo: str, per_page: int) -> List[Dict[str, Any]]:
+        data, _ = await self._get(
+            f"{self.repos_url}/{owner}/{repo}/actions/runs",
+            params={"per_page": per_page, "status": "completed"}
+        )
+        return data.get("workflow_runs", [])
 
-    async def get_runners(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+    async def get_runners(self, owner: str, repo: str, no_cache: bool = False) -> List[Dict[str, Any]]:
         """Get self-hosted runners for a repository"""
+        return await self._cached(
+            CACHE_TTL_SHORT, ("runners", owner, repo),
+            lambda: self._fetch_runners(owner, repo), no_cache
+        )
+
+    async def _fetch_runners(self, owner: str, repo: str) -> List[Dict[str, Any]]:
         try:
-            response = await self.client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/actions/runners"
+            data, _ = await self._get(
+                f"{self.repos_url}/{owner}/{repo}/actions/runners"
             )
-            response.raise_for_status()
-            return response.json().get("runners", [])
+            return data.get("runners", [])
         except httpx.HTTPStatusError as e:
             # Log the error for debugging
             print(f"Failed to get runners for {owner}/{repo}: {e.response.status_code} - {e.response.text}")
-            return []
+            raise
 
-    async def get_branches(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+    async def get_branches(self, owner: str, repo: str, no_cache: bool = False) -> List[Dict[str, Any]]:
         """Get branches for a repository"""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/branches",
-                params={"per_page": 100}
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError:
-            return []
+        return await self._cached(
+            CACHE_TTL_NORMAL, ("branches", owner, repo),
+            lambda: self._fetch_branches(owner, repo), no_cache
+        )
+
+    async def _fetch_branches(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+        data, _ = await self._get(
+            f"{self.repos_url}/{owner}/{repo}/branches",
+            params={"per_page": TREE_LIMIT}
+        )
+        return data
 
-    async def get_pull_requests(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+    async def get_pull_requests(self, owner: str, repo: str, no_cache: bool = False) -> List[Dict[str, Any]]:
         """Get pull requests for a repository"""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/pulls",
-                params={"state": "all", "per_page": 50, "sort": "updated"}
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError:
-            return []
+        return await self._cached(
+            CACHE_TTL_SHORT, ("pull_requests", owner, repo),
+            lambda: self._fetch_pull_requests(owner, repo), no_cache
+        )
+
+    async def _fetch_pull_requests(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+        data, _ = await self._get(
+            f"{self.repos_url}/{owner}/{repo}/pulls",
+            params={"state": "all", "per_page": TREE_LIMIT, "sort": "updated"}
+        )
+        return data
 
-    async def get_issues(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+    async def get_issues(self, owner: str, repo: str, no_cache: bool = False) -> List[Dict[str, Any]]:
         """Get issues for a repository (excluding PRs)"""
-        try:
-            response = await self.client.get(
-                f"{self.base_url}/repos/{owner}/{repo}/issues",
-                params={"state": "all", "per_page": 50, "sort": "updated"}
+        return await self._cached(
+            CACHE_TTL_SHORT, ("issues", owner, repo),
+            lambda: self._fetch_issues(owner, repo), no_cache
+        )
+
+    async def _fetch_issues(self, owner: str, repo: str) -> List[Dict[str, Any]]:
+        data, _ = await self._get(
+            f"{self.repos_url}/{owner}/{repo}/issues",
+            params={"state": "all", "per_page": ISSUES_FETCH_LIMIT, "sort": "updated"}
+        )
+        # Filter out pull requests (they appear in issues endpoint too)
+        return list(filter(_is_issue, data))
+
+    async def get_repo_bundle(self, owner: str, repo: str, no_cache: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+        """Get branches, pull requests and issues for a repository
+
+        Pull requests and issues come from one GraphQL query, shaped like their REST
+        counterparts, and fall back to the REST endpoints when the query fails.
+        Branches are fetched from REST alongside it, since only REST reports branch
+        protection to non-admins. A section GitHub refuses to serve is left empty.
+        """
+        return await self._cached(
+            CACHE_TTL_SHORT, ("repo_bundle", owner, repo),
+            lambda: self._fetch_repo_bundle(owner, repo, no_cache), no_cache
+        )
+
+    async def _fetch_repo_bundle(
+        self, owner: str, repo: str, no_cache: bool = False
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        branches, repository = await asyncio.gather(
+            self.get_branches(owner, repo, no_cache),
+            self._query_repository(owner, repo),
+            return_exceptions=True
+        )
+        repository = _section(repository)
+
+        if repository is None:
+            pull_requests, issues = await asyncio.gather(
+                self.get_pull_requests(owner, repo, no_cache),
+                self.get_issues(owner, repo, no_cache),
+                return_exceptions=True
             )
+            return {
+                "branches": _section(branches),
+                "pull_requests": _section(pull_requests),
+                "issues": _section(issues)
+            }
+
+        return {
+            "branches": _section(branches),
+            "pull_requests": [
+                {
+                    "id": pr["databaseId"],
+                    "number": pr["number"],
+                    "title": pr["title"],
+                    # REST reports merged pull requests as closed
+                    "state": "open" if pr["state"] == "OPEN" else "closed",
+                    "html_url": pr["url"],
+                    "created_at": pr["createdAt"],
+                    "updated_at": pr["updatedAt"],
+                    "draft": pr["isDraft"]
+                }
+                for pr in _nodes(repository, "pullRequests")
+            ],
+            "issues": [
+                {
+                    "id": issue["databaseId"],
+                    "number": issue["number"],
+                    "title": issue["title"],
+                    "state": issue["state"].lower(),
+                    "html_url": issue["url"],
+                    "created_at": issue["createdAt"],
+                    "updated_at": issue["updatedAt"]
+                }
+                for issue in _nodes(repository, "issues")
+            ]
+        }
+
+    async def _query_repository(self, owner: str, repo: str) -> Optional[Dict[str, Any]]:
+        """Run the bundle query; None when GitHub rejects it or returns no repository"""
+        try:
+            response = await self._post(self.graphql_url, {
+                "query": REPO_BUNDLE_QUERY,
+                "variables": {"owner": owner, "name": repo, "first": TREE_LIMIT}
+            })
             response.raise_for_status()
-            # Filter out pull requests (they appear in issues endpoint too)
-            issues = response.json()
-            return [issue for issue in issues if "pull_request" not in issue]
         except httpx.HTTPStatusError:
-            return []
+            return None
+        return (orjson.loads(response.content).get("data") or {}).get("repository")
 
     async def close(self):
         """Close the HTTP client"""
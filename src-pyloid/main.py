@@ -5,9 +5,8 @@ from pyloid.utils import (
     get_production_path,
     is_production,
 )
-from pyloid.serve import pyloid_serve
 from pyloid import Pyloid
-from server import adapter
+from backend import adapter
 
 app = Pyloid(app_name="GitHub Desktop Clone", single_instance=True, server=adapter)
 
@@ -33,6 +32,9 @@ app.set_tray_menu_items(
 ####################################################################
 
 if is_production():
+    # The static file server is only needed for the packaged build
+    from pyloid.serve import pyloid_serve
+
     url = pyloid_serve(directory=get_production_path("dist-front"))
     window = app.create_window(
         title="GitHub Desktop Clone - Production",
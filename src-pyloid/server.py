@@ -1,26 +1,124 @@
-from pyloid_adapter.base_adapter import BaseAdapter
 from pyloid_adapter.context import PyloidContext
-from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi import Depends, FastAPI, HTTPException, Header, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.types import Receive, Scope, Send
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import hashlib
+import time
+import httpx
+import orjson
 
 # GitHub API imports
-from github_client import GitHubClient
+from github_client import GitHubClient, DEFAULT_API_URL, TREE_LIMIT
 from models import TreeNode, RateLimitInfo
-from config import settings
+from config import settings, DEFAULT_TOKEN
 from version import __version__, __app_name__, __description__
+from backend import adapter
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+def nodes_response(nodes: List[TreeNode]) -> ORJSONResponse:
+    """Serialize tree nodes straight to orjson, skipping FastAPI's response_model encoding"""
+    return ORJSONResponse([node.model_dump() for node in nodes])
+
+def ndjson_response(nodes: List[TreeNode]) -> Response:
+    """Serialize tree nodes as newline-delimited JSON, one node per line"""
+    body = b"".join(orjson.dumps(node.model_dump()) + b"\n" for node in nodes)
+    return Response(body, media_type="application/x-ndjson")
+
+def github_http_exception(e: httpx.HTTPStatusError) -> HTTPException:
+    """Translate a failed GitHub response into the matching API error"""
+    status_code = e.response.status_code
+    if status_code == 401:
+        return HTTPException(status_code=401, detail="Invalid GitHub token")
+    elif status_code == 403:
+        return HTTPException(status_code=403, detail="GitHub API rate limit exceeded")
+    else:
+        return HTTPException(status_code=status_code, detail=str(e))
+
+def is_github_outage(e: httpx.HTTPStatusError) -> bool:
+    """Whether GitHub is failing or throttling us, so a stale copy beats an error"""
+    response = e.response
+    if response.status_code == 403:
+        # A 403 is only throttling when GitHub says so; otherwise the token lacks access
+        return "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+    return response.status_code >= 500 or response.status_code == 429
+
+def org_error_line(org_login: str, e: Exception) -> bytes:
+    """NDJSON record reporting an organization that couldn't be loaded"""
+    if isinstance(e, httpx.HTTPStatusError):
+        error = github_http_exception(e)
+        status_code, detail = error.status_code, error.detail
+    else:
+        status_code, detail = 500, str(e)
+    return orjson.dumps({"error": {"org": org_login, "status": status_code, "detail": detail}}) + b"\n"
+
+class GitHubErrorRoute(APIRoute):
+    """Route that turns GitHub and unexpected errors into HTTP errors
+
+    Errors are raised as HTTPException inside the route so the responses still
+    pass through the CORS middleware.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                return await handler(request)
+            except (StarletteHTTPException, RequestValidationError):
+                raise
+            except httpx.HTTPStatusError as e:
+                raise github_http_exception(e)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+
+        return route_handler
+
+class NonStreamingGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves streamed (stream=true) responses uncompressed
+
+    The gzip encoder buffers its output, which would hold back NDJSON lines
+    that are meant to reach the client as soon as they are written.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and Request(scope).query_params.get("stream", "").lower() in ("1", "true", "yes", "on"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
 app = FastAPI(
     title=__app_name__,
     description=__description__,
-    version=__version__
+    version=__version__,
+    default_response_class=ORJSONResponse
 )
+app.router.route_class = GitHubErrorRoute
 
 def start(host: str, port: int):
     import uvicorn
+
     # Use fixed port 8000 for development
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    config = uvicorn.Config(
+        app,
+        host="127.0.0.1",
+        port=8000,
+        log_level=settings.backend_log_level,
+        access_log=False
+    )
+    uvicorn.Server(config).run()
 
 def setup_cors():
     app.add_middleware(
@@ -31,123 +129,235 @@ def setup_cors():
         allow_headers=['*'],
     )
 
-adapter = BaseAdapter(start, setup_cors)
-
-# Default GitHub client (uses env token if available)
-default_github_client = GitHubClient() if settings.github_token else None
+setup_cors()
+app.add_middleware(NonStreamingGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+if settings.profiling:
+    from pyinstrument import Profiler
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        """Return a pyinstrument report instead of the response when ?profile=1 is passed"""
+        if not request.query_params.get("profile"):
+            return await call_next(request)
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        response = await call_next(request)
+        # Streamed endpoints do their work while the body is produced
+        async for _ in response.body_iterator:
+            pass
+        profiler.stop()
+        return HTMLResponse(profiler.output_html())
+
+# Shared GitHub clients keyed by (token hash, API URL) so connections are reused across requests,
+# least recently used first. Clients pushed out by newer tokens may still serve an in-flight
+# request or stream, so they are only closed on shutdown.
+MAX_GITHUB_CLIENTS = 4
+_github_clients: Dict[Tuple[str, str], GitHubClient] = {}
+_retired_github_clients: List[GitHubClient] = []
+
+# Built trees keyed by (token hash, API URL, orgs param) -> (built_at, nodes)
+TREE_CACHE_TTL = 60
+_tree_cache: Dict[Tuple[str, str, str], Tuple[float, List[TreeNode]]] = {}
+
+# Serialized repository details keyed by (token hash, API URL, owner, repo) -> (built_at, body)
+REPO_DETAILS_CACHE_TTL = 30
+REPO_DETAILS_CACHE_SIZE = 256
+_repo_details_cache: Dict[Tuple[str, str, str, str], Tuple[float, bytes]] = {}
+
+def hash_token(token: str) -> str:
+    """Hash a token so it can be used as a cache key without keeping it in plain text"""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
 
 def get_github_client(token: str, api_url: Optional[str] = None) -> GitHubClient:
-    """Create a GitHub client with the provided token and API URL"""
-    return GitHubClient(token=token, api_url=api_url)
+    """Get the shared GitHub client for the provided token and API URL"""
+    api_url = api_url or DEFAULT_API_URL
+    key = (hash_token(token), api_url)
+    client = _github_clients.pop(key, None)
+    if client is None:
+        client = GitHubClient(token=token, api_url=api_url)
+        if len(_github_clients) >= MAX_GITHUB_CLIENTS:
+            # Retire the least recently used client along with the trees and details built with it
+            old_key = next(iter(_github_clients))
+            _retired_github_clients.append(_github_clients.pop(old_key))
+            for cache in (_tree_cache, _repo_details_cache):
+                for cache_key in [k for k in cache if k[:2] == old_key]:
+                    del cache[cache_key]
+    _github_clients[key] = client
+    return client
+
+def store_repo_details(key: Tuple[str, str, str, str], body: bytes) -> None:
+    """Cache serialized repository details, dropping expired and then the oldest entries"""
+    now = time.monotonic()
+    _repo_details_cache.pop(key, None)
+    if len(_repo_details_cache) >= REPO_DETAILS_CACHE_SIZE:
+        for stale_key in [k for k, (built_at, _) in _repo_details_cache.items() if now - built_at >= REPO_DETAILS_CACHE_TTL]:
+            del _repo_details_cache[stale_key]
+    while len(_repo_details_cache) >= REPO_DETAILS_CACHE_SIZE:
+        del _repo_details_cache[next(iter(_repo_details_cache))]
+    _repo_details_cache[key] = (now, body)
+
+async def github_token(x_github_token: Optional[str] = Header(None)) -> str:
+    """Token from the X-GitHub-Token header, falling back to the configured one"""
+    token = x_github_token or DEFAULT_TOKEN
+    if not token:
+        raise HTTPException(status_code=401, detail="GitHub token is required")
+    return token
+
+async def github_api_url(x_github_api_url: Optional[str] = Header(None)) -> str:
+    """API URL from the X-GitHub-API-URL header, defaulting to github.com"""
+    return x_github_api_url or DEFAULT_API_URL
+
+async def github_client(
+    token: str = Depends(github_token),
+    api_url: str = Depends(github_api_url)
+) -> GitHubClient:
+    """Shared GitHub client for the request's token and API URL"""
+    return get_github_client(token, api_url)
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    if default_github_client:
-        await default_github_client.close()
+    for client in [*_github_clients.values(), *_retired_github_clients]:
+        await client.close()
+    _github_clients.clear()
+    _retired_github_clients.clear()
 
 # GitHub API Endpoints
 
 @app.get("/api/rate-limit", response_model=RateLimitInfo)
-async def get_rate_limit(
-    x_github_token: Optional[str] = Header(None),
-    x_github_api_url: Optional[str] = Header(None)
-):
+async def get_rate_limit(client: GitHubClient = Depends(github_client)):
     """Get current GitHub API rate limit status"""
-    import httpx
-
-    try:
-        token = x_github_token or (settings.github_token if settings.github_token else None)
-        if not token:
-            raise HTTPException(status_code=401, detail="GitHub token is required")
-
-        api_url = x_github_api_url or "https://api.github.com"
-        client = get_github_client(token, api_url)
-        data = await client.get_rate_limit()
-        await client.close()
-
-        core_rate = data["resources"]["core"]
-        return RateLimitInfo(
-            limit=core_rate["limit"],
-            remaining=core_rate["remaining"],
-            reset=core_rate["reset"],
-            used=core_rate["used"]
-        )
-    except HTTPException:
-        raise
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 401:
-            raise HTTPException(status_code=401, detail="Invalid GitHub token")
-        elif e.response.status_code == 403:
-            raise HTTPException(status_code=403, detail="GitHub API rate limit exceeded")
-        else:
-            raise HTTPException(status_code=e.response.status_code, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await client.get_rate_limit()
+
+    core_rate = data["resources"]["core"]
+    return RateLimitInfo(
+        limit=core_rate["limit"],
+        remaining=core_rate["remaining"],
+        reset=core_rate["reset"],
+        used=core_rate["used"]
+    )
 
 @app.get("/api/tree", response_model=List[TreeNode])
 async def get_tree(
     orgs: Optional[str] = None,
-    x_github_token: Optional[str] = Header(None),
-    x_github_api_url: Optional[str] = Header(None)
+    refresh: bool = False,
+    stream: bool = False,
+    token: str = Depends(github_token),
+    api_url: str = Depends(github_api_url)
 ):
-    """Get the lightweight repository tree structure"""
-    import httpx
+    """Get the lightweight repository tree structure
 
-    try:
-        token = x_github_token or (settings.github_token if settings.github_token else None)
-        if not token:
-            raise HTTPException(status_code=401, detail="GitHub token is required")
+    With stream=true the nodes are sent as NDJSON, one organization per line in
+    request order, each as soon as its repositories have been fetched. An
+    organization that can't be loaded is sent as an {"error": {...}} line instead.
+    """
+    respond = ndjson_response if stream else nodes_response
+
+    # Serve a recent identical tree unless the caller asks for a refresh
+    cache_key = (hash_token(token), api_url, orgs or "")
+    cached = _tree_cache.get(cache_key)
+    if cached and not refresh and time.monotonic() - cached[0] < TREE_CACHE_TTL:
+        return respond(cached[1])
 
-        api_url = x_github_api_url or "https://api.github.com"
-        client = get_github_client(token, api_url)
-        tree_nodes = []
+    client = get_github_client(token, api_url)
+    tree_nodes = []
 
-        # Parse orgs parameter
-        org_list = [o.strip() for o in orgs.split(',')] if orgs else []
+    # Parse orgs parameter
+    org_list = orgs.split(',') if orgs else ()
 
+    try:
         # Get organizations or user repos
         if org_list:
-            orgs_to_fetch = [{"login": org} for org in org_list]
+            orgs_to_fetch = [{"login": org.strip()} for org in org_list]
         elif settings.github_org:
             orgs_to_fetch = [{"login": settings.github_org}]
         else:
-            orgs_to_fetch = await client.get_user_orgs()
+            # Organizations and personal repos are independent, so fetch them together
+            orgs_to_fetch, personal_repos = await asyncio.gather(
+                client.get_user_orgs(),
+                client.get_user_repos()
+            )
             # Also include personal repos
-            personal_repos = await client.get_user_repos()
             if personal_repos:
                 personal_node = await build_org_tree_lightweight(client, "Personal Repositories", personal_repos)
                 tree_nodes.append(personal_node)
 
-        # Build tree for each organization
-        for org_data in orgs_to_fetch:
-            org_login = org_data["login"]
-            repos = await client.get_org_repos(org_login)
+        org_logins = [org_data["login"] for org_data in orgs_to_fetch]
+        if stream:
+            return StreamingResponse(
+                stream_org_trees(client, cache_key, cached, tree_nodes, org_logins),
+                media_type="application/x-ndjson"
+            )
+
+        # Fetch every organization's repos concurrently, then build the trees in order
+        org_repos = await asyncio.gather(*(client.get_org_repos(login) for login in org_logins))
+    except httpx.HTTPStatusError as e:
+        # Fall back to the last good tree when GitHub is failing or throttling us
+        if cached and is_github_outage(e):
+            return respond(cached[1])
+        raise
+
+    for org_login, repos in zip(org_logins, org_repos):
+        org_node = await build_org_tree_lightweight(client, org_login, repos)
+        tree_nodes.append(org_node)
+
+    _tree_cache[cache_key] = (time.monotonic(), tree_nodes)
+    return nodes_response(tree_nodes)
+
+async def stream_org_trees(
+    client: GitHubClient,
+    cache_key: Tuple[str, str, str],
+    cached: Optional[Tuple[float, List[TreeNode]]],
+    tree_nodes: List[TreeNode],
+    org_logins: List[str]
+) -> AsyncIterator[bytes]:
+    """Yield the already built nodes, then each organization's tree in order as its repos arrive
+
+    The response has already started, so a failing organization is reported as
+    an error line (or replaced by its node from the last good tree) instead of
+    aborting the stream.
+    """
+    for node in tree_nodes:
+        yield orjson.dumps(node.model_dump()) + b"\n"
+
+    stale_nodes = {node.id: node for node in cached[1]} if cached else {}
+    complete = True
+
+    # Fetch all organizations at once but emit them in request order
+    tasks = [asyncio.ensure_future(client.get_org_repos(login)) for login in org_logins]
+    try:
+        for org_login, task in zip(org_logins, tasks):
+            try:
+                repos = await task
+            except Exception as e:
+                complete = False
+                stale_node = stale_nodes.get(f"org-{org_login}")
+                if stale_node and isinstance(e, httpx.HTTPStatusError) and is_github_outage(e):
+                    yield orjson.dumps(stale_node.model_dump()) + b"\n"
+                else:
+                    yield org_error_line(org_login, e)
+                continue
             org_node = await build_org_tree_lightweight(client, org_login, repos)
             tree_nodes.append(org_node)
+            yield orjson.dumps(org_node.model_dump()) + b"\n"
+    finally:
+        # Don't leave fetches running if the client disconnected
+        for task in tasks:
+            task.cancel()
 
-        await client.close()
-        return tree_nodes
-
-    except HTTPException:
-        raise
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 401:
-            raise HTTPException(status_code=401, detail="Invalid GitHub token")
-        elif e.response.status_code == 403:
-            raise HTTPException(status_code=403, detail="GitHub API rate limit exceeded")
-        else:
-            raise HTTPException(status_code=e.response.status_code, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Only a fully fresh tree is worth caching
+    if complete:
+        _tree_cache[cache_key] = (time.monotonic(), tree_nodes)
 
 async def build_org_tree_lightweight(client: GitHubClient, org_name: str, repos: List[dict]) -> TreeNode:
     """Build lightweight tree structure for an organization"""
-    org_node = TreeNode(
+    repo_count = len(repos)
+    org_node = TreeNode.model_construct(
         id=f"org-{org_name}",
         name=org_name,
         type="organization",
-        metadata={"repo_count": len(repos)},
-        hasChildren=len(repos) > 0,
+        metadata={"repo_count": repo_count},
+        hasChildren=repo_count > 0,
         isLoaded=True
     )
 
@@ -155,7 +365,7 @@ async def build_org_tree_lightweight(client: GitHubClient, org_name: str, repos:
         owner = repo["owner"]["login"]
         repo_name = repo["name"]
 
-        repo_node = TreeNode(
+        repo_node = TreeNode.model_construct(
             id=f"repo-{owner}-{repo_name}",
             name=repo_name,
             type="repository",
@@ -175,231 +385,265 @@ async def build_org_tree_lightweight(client: GitHubClient, org_name: str, repos:
 
     return org_node
 
-async def build_repo_details(client: GitHubClient, owner: str, repo_name: str) -> List[TreeNode]:
-    """Build detailed children for a repository"""
-    children = []
-
-    # Get workflows
-    workflows = await client.get_workflows(owner, repo_name)
-    if workflows:
-        workflows_node = TreeNode(
-            id=f"workflows-{owner}-{repo_name}",
-            name=f"Workflows ({len(workflows)})",
-            type="workflows",
-            hasChildren=len(workflows) > 0,
+def build_workflows_node(owner: str, repo_name: str, workflows: List[dict]) -> Optional[TreeNode]:
+    """Build the workflows section of a repository"""
+    if not workflows:
+        return None
+    workflows_node = TreeNode.model_construct(
+        id=f"workflows-{owner}-{repo_name}",
+        name=f"Workflows ({len(workflows)})",
+        type="workflows",
+        hasChildren=True,
+        isLoaded=True
+    )
+    for workflow in workflows[:TREE_LIMIT]:
+        workflow_node = TreeNode.model_construct(
+            id=f"workflow-{workflow['id']}",
+            name=workflow["name"],
+            type="workflow",
+            status=workflow.get("state"),
+            url=workflow.get("html_url"),
+            metadata={"path": workflow.get("path")},
+            hasChildren=False,
             isLoaded=True
         )
-        for workflow in workflows[:20]:
-            workflow_node = TreeNode(
-                id=f"workflow-{workflow['id']}",
-                name=workflow["name"],
-                type="workflow",
-                status=workflow.get("state"),
-                url=workflow.get("html_url"),
-                metadata={"path": workflow.get("path")},
-                hasChildren=False,
-                isLoaded=True
-            )
-            workflows_node.children.append(workflow_node)
-        children.append(workflows_node)
-
-    # Get workflow runs
-    workflow_runs = await client.get_workflow_runs(owner, repo_name, per_page=10)
-    if workflow_runs:
-        runs_node = TreeNode(
-            id=f"runs-{owner}-{repo_name}",
-            name=f"Recent Runs ({len(workflow_runs)})",
-            type="workflow_runs",
-            hasChildren=len(workflow_runs) > 0,
+        workflows_node.children.append(workflow_node)
+    return workflows_node
+
+def build_runs_node(owner: str, repo_name: str, workflow_runs: List[dict]) -> Optional[TreeNode]:
+    """Build the recent workflow runs section of a repository"""
+    if not workflow_runs:
+        return None
+    runs_node = TreeNode.model_construct(
+        id=f"runs-{owner}-{repo_name}",
+        name=f"Recent Runs ({len(workflow_runs)})",
+        type="workflow_runs",
+        hasChildren=True,
+        isLoaded=True
+    )
+    for run in workflow_runs[:10]:
+        run_node = TreeNode.model_construct(
+            id=f"run-{run['id']}",
+            name=f"{run['name']} #{run['run_number']}",
+            type="workflow_run",
+            status=run.get("conclusion", run.get("status")),
+            url=run.get("html_url"),
+            metadata={
+                "created_at": run.get("created_at"),
+                "updated_at": run.get("updated_at")
+            },
+            hasChildren=False,
             isLoaded=True
         )
-        for run in workflow_runs[:10]:
-            run_node = TreeNode(
-                id=f"run-{run['id']}",
-                name=f"{run['name']} #{run['run_number']}",
-                type="workflow_run",
-                status=run.get("conclusion", run.get("status")),
-                url=run.get("html_url"),
-                metadata={
-                    "created_at": run.get("created_at"),
-                    "updated_at": run.get("updated_at")
-                },
-                hasChildren=False,
-                isLoaded=True
-            )
-            runs_node.children.append(run_node)
-        children.append(runs_node)
-
-    # Get runners
-    runners = await client.get_runners(owner, repo_name)
-    if runners:
-        runners_node = TreeNode(
-            id=f"runners-{owner}-{repo_name}",
-            name=f"Runners ({len(runners)})",
-            type="runners",
-            hasChildren=len(runners) > 0,
+        runs_node.children.append(run_node)
+    return runs_node
+
+def build_runners_node(owner: str, repo_name: str, runners: List[dict]) -> Optional[TreeNode]:
+    """Build the self-hosted runners section of a repository"""
+    if not runners:
+        return None
+    runners_node = TreeNode.model_construct(
+        id=f"runners-{owner}-{repo_name}",
+        name=f"Runners ({len(runners)})",
+        type="runners",
+        hasChildren=True,
+        isLoaded=True
+    )
+    for runner in runners:
+        runner_node = TreeNode.model_construct(
+            id=f"runner-{runner['id']}",
+            name=runner["name"],
+            type="runner",
+            status=runner.get("status"),
+            metadata={
+                "os": runner.get("os"),
+                "busy": runner.get("busy")
+            },
+            hasChildren=False,
             isLoaded=True
         )
-        for runner in runners:
-            runner_node = TreeNode(
-                id=f"runner-{runner['id']}",
-                name=runner["name"],
-                type="runner",
-                status=runner.get("status"),
-                metadata={
-                    "os": runner.get("os"),
-                    "busy": runner.get("busy")
-                },
-                hasChildren=False,
-                isLoaded=True
-            )
-            runners_node.children.append(runner_node)
-        children.append(runners_node)
-
-    # Get branches
-    branches = await client.get_branches(owner, repo_name)
-    if branches:
-        branches_node = TreeNode(
-            id=f"branches-{owner}-{repo_name}",
-            name=f"Branches ({len(branches)})",
-            type="branches",
-            hasChildren=len(branches) > 0,
+        runners_node.children.append(runner_node)
+    return runners_node
+
+def build_branches_node(owner: str, repo_name: str, branches: List[dict]) -> Optional[TreeNode]:
+    """Build the branches section of a repository"""
+    if not branches:
+        return None
+    branches_node = TreeNode.model_construct(
+        id=f"branches-{owner}-{repo_name}",
+        name=f"Branches ({len(branches)})",
+        type="branches",
+        hasChildren=True,
+        isLoaded=True
+    )
+    branch_id_prefix = f"branch-{owner}-{repo_name}-"
+    for branch in branches[:TREE_LIMIT]:
+        branch_node = TreeNode.model_construct(
+            id=branch_id_prefix + branch["name"],
+            name=branch["name"],
+            type="branch",
+            metadata={"protected": branch.get("protected", False)},
+            hasChildren=False,
             isLoaded=True
         )
-        for branch in branches[:20]:
-            branch_node = TreeNode(
-                id=f"branch-{owner}-{repo_name}-{branch['name']}",
-                name=branch["name"],
-                type="branch",
-                metadata={"protected": branch.get("protected", False)},
-                hasChildren=False,
-                isLoaded=True
-            )
-            branches_node.children.append(branch_node)
-        children.append(branches_node)
-
-    # Get pull requests
-    pull_requests = await client.get_pull_requests(owner, repo_name)
-    if pull_requests:
-        prs_node = TreeNode(
-            id=f"prs-{owner}-{repo_name}",
-            name=f"Pull Requests ({len(pull_requests)})",
-            type="pull_requests",
-            hasChildren=len(pull_requests) > 0,
+        branches_node.children.append(branch_node)
+    return branches_node
+
+def build_prs_node(owner: str, repo_name: str, pull_requests: List[dict]) -> Optional[TreeNode]:
+    """Build the pull requests section of a repository"""
+    if not pull_requests:
+        return None
+    prs_node = TreeNode.model_construct(
+        id=f"prs-{owner}-{repo_name}",
+        name=f"Pull Requests ({len(pull_requests)})",
+        type="pull_requests",
+        hasChildren=True,
+        isLoaded=True
+    )
+    for pr in pull_requests[:TREE_LIMIT]:
+        pr_node = TreeNode.model_construct(
+            id=f"pr-{pr['id']}",
+            name=f"#{pr['number']} {pr['title']}",
+            type="pull_request",
+            status=pr.get("state"),
+            url=pr.get("html_url"),
+            metadata={
+                "created_at": pr.get("created_at"),
+                "updated_at": pr.get("updated_at"),
+                "draft": pr.get("draft", False)
+            },
+            hasChildren=False,
             isLoaded=True
         )
-        for pr in pull_requests[:20]:
-            pr_node = TreeNode(
-                id=f"pr-{pr['id']}",
-                name=f"#{pr['number']} {pr['title']}",
-                type="pull_request",
-                status=pr.get("state"),
-                url=pr.get("html_url"),
-                metadata={
-                    "created_at": pr.get("created_at"),
-                    "updated_at": pr.get("updated_at"),
-                    "draft": pr.get("draft", False)
-                },
-                hasChildren=False,
-                isLoaded=True
-            )
-            prs_node.children.append(pr_node)
-        children.append(prs_node)
-
-    # Get issues
-    issues = await client.get_issues(owner, repo_name)
-    if issues:
-        issues_node = TreeNode(
-            id=f"issues-{owner}-{repo_name}",
-            name=f"Issues ({len(issues)})",
-            type="issues",
-            hasChildren=len(issues) > 0,
+        prs_node.children.append(pr_node)
+    return prs_node
+
+def build_issues_node(owner: str, repo_name: str, issues: List[dict]) -> Optional[TreeNode]:
+    """Build the issues section of a repository"""
+    if not issues:
+        return None
+    issues_node = TreeNode.model_construct(
+        id=f"issues-{owner}-{repo_name}",
+        name=f"Issues ({len(issues)})",
+        type="issues",
+        hasChildren=True,
+        isLoaded=True
+    )
+    for issue in issues[:TREE_LIMIT]:
+        issue_node = TreeNode.model_construct(
+            id=f"issue-{issue['id']}",
+            name=f"#{issue['number']} {issue['title']}",
+            type="issue",
+            status=issue.get("state"),
+            url=issue.get("html_url"),
+            metadata={
+                "created_at": issue.get("created_at"),
+                "updated_at": issue.get("updated_at")
+            },
+            hasChildren=False,
             isLoaded=True
         )
-        for issue in issues[:20]:
-            issue_node = TreeNode(
-                id=f"issue-{issue['id']}",
-                name=f"#{issue['number']} {issue['title']}",
-                type="issue",
-                status=issue.get("state"),
-                url=issue.get("html_url"),
-                metadata={
-                    "created_at": issue.get("created_at"),
-                    "updated_at": issue.get("updated_at")
-                },
-                hasChildren=False,
-                isLoaded=True
-            )
-            issues_node.children.append(issue_node)
-        children.append(issues_node)
-
-    return children
+        issues_node.children.append(issue_node)
+    return issues_node
+
+async def build_repo_details(
+    client: GitHubClient, owner: str, repo_name: str, refresh: bool = False
+) -> Tuple[List[TreeNode], bool]:
+    """Build detailed children for a repository
+
+    Sections GitHub refuses to serve come back empty; the flag is False when one
+    of them failed only because GitHub was failing or throttling us.
+    """
+    # Fetch all sub-resources concurrently; network failures propagate to the caller
+    # (branches, pull requests and issues come back together from one GraphQL query)
+    results = await asyncio.gather(
+        client.get_workflows(owner, repo_name, no_cache=refresh),
+        client.get_workflow_runs(owner, repo_name, per_page=10, no_cache=refresh),
+        client.get_runners(owner, repo_name, no_cache=refresh),
+        client.get_repo_bundle(owner, repo_name, no_cache=refresh),
+        return_exceptions=True
+    )
+    complete = True
+    for i, result in enumerate(results):
+        if isinstance(result, httpx.HTTPStatusError):
+            complete = complete and not is_github_outage(result)
+            results[i] = {} if i == 3 else []
+        elif isinstance(result, BaseException):
+            raise result
+    workflows, workflow_runs, runners, bundle = results
+
+    sections = [
+        build_workflows_node(owner, repo_name, workflows),
+        build_runs_node(owner, repo_name, workflow_runs),
+        build_runners_node(owner, repo_name, runners),
+        build_branches_node(owner, repo_name, bundle.get("branches", [])),
+        build_prs_node(owner, repo_name, bundle.get("pull_requests", [])),
+        build_issues_node(owner, repo_name, bundle.get("issues", [])),
+    ]
+    return [section for section in sections if section is not None], complete
 
 @app.get("/api/repo-details/{owner}/{repo}", response_model=List[TreeNode])
 async def get_repo_details(
     owner: str,
     repo: str,
-    x_github_token: Optional[str] = Header(None),
-    x_github_api_url: Optional[str] = Header(None)
+    refresh: bool = False,
+    token: str = Depends(github_token),
+    api_url: str = Depends(github_api_url)
 ):
-    """Get detailed information for a specific repository"""
-    import httpx
-
-    try:
-        token = x_github_token or (settings.github_token if settings.github_token else None)
-        if not token:
-            raise HTTPException(status_code=401, detail="GitHub token is required")
-
-        api_url = x_github_api_url or "https://api.github.com"
-        client = get_github_client(token, api_url)
-
-        # Build detailed children for this repository
-        children = await build_repo_details(client, owner, repo)
-
-        await client.close()
-        return children
-
-    except HTTPException:
-        raise
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 401:
-            raise HTTPException(status_code=401, detail="Invalid GitHub token")
-        elif e.response.status_code == 403:
-            raise HTTPException(status_code=403, detail="GitHub API rate limit exceeded")
-        else:
-            raise HTTPException(status_code=e.response.status_code, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """Get detailed information for a specific repository
+
+    refresh=true skips the cached details and refetches every section from GitHub.
+    """
+    # Collapsing and re-expanding a repository reuses the recently built details
+    cache_key = (hash_token(token), api_url, owner, repo)
+    cached = _repo_details_cache.get(cache_key)
+    if cached and not refresh and time.monotonic() - cached[0] < REPO_DETAILS_CACHE_TTL:
+        return Response(cached[1], media_type="application/json")
+
+    # Build detailed children for this repository
+    client = get_github_client(token, api_url)
+    children, complete = await build_repo_details(client, owner, repo, refresh)
+
+    body = orjson.dumps([child.model_dump() for child in children])
+    # Details missing sections because of a GitHub outage are served but not kept
+    if complete:
+        store_repo_details(cache_key, body)
+    return Response(body, media_type="application/json")
+
+# Static endpoint bodies, serialized once at import
+ROOT_BODY = orjson.dumps({
+    "name": __app_name__,
+    "version": __version__,
+    "description": __description__,
+    "status": "running",
+    "docs_url": "/docs",
+})
+VERSION_BODY = orjson.dumps({
+    "version": __version__,
+    "name": __app_name__,
+    "description": __description__,
+})
 
 @app.get("/")
 async def root():
     """Root endpoint with basic API information"""
-    return {
-        "name": __app_name__,
-        "version": __version__,
-        "description": __description__,
-        "status": "running",
-        "docs_url": "/docs",
-    }
+    return Response(ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
+    # Only the timestamp changes, so skip FastAPI's encoder and dump straight to bytes
+    return Response(orjson.dumps({
         "status": "healthy",
         "version": __version__,
         "timestamp": datetime.utcnow().isoformat(),
         "service": __app_name__,
-    }
+    }), media_type="application/json")
 
 @app.get("/api/version")
 async def get_version():
     """Get API version information"""
-    return {
-        "version": __version__,
-        "name": __app_name__,
-        "description": __description__,
-    }
+    return Response(VERSION_BODY, media_type="application/json")
 
 # Pyloid specific endpoints
 @app.get('/create_window')
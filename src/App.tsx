@@ -21,8 +21,8 @@ import { RateLimitDisplay } from './components/RateLimitDisplay';
 import { SettingsDialog } from './components/SettingsDialog';
 import { SearchFilter, type SearchFilterState } from './components/SearchFilter';
 import { ListView } from './components/ListView';
-import { fetchTree, fetchRateLimit, fetchRepoDetails } from './api';
-import type { TreeNode, RateLimitInfo } from './types';
+import { fetchTreeStream, fetchRateLimit, fetchRepoDetails } from './api';
+import type { TreeNode, RateLimitInfo, TreeStreamError } from './types';
 import { loadSettings, saveSettings } from './utils/storage';
 import { filterTreeNodes, countTreeNodes, filterEnabledNodes } from './utils/filterTree';
 import { getVersionInfo, ENVIRONMENT } from './config/version';
@@ -60,7 +60,10 @@ function App() {
   const [filteredTreeData, setFilteredTreeData] = useState<TreeNode[]>([]);
   const [rateLimit, setRateLimit] = useState<RateLimitInfo | null>(null);
   const [loading, setLoading] = useState(true);
+  // True until the tree stream has ended, even after the first organization is shown
+  const [streaming, setStreaming] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [orgErrors, setOrgErrors] = useState<TreeStreamError[]>([]);
   const [settingsOpen, setSettingsOpen] = useState(false);
   const [token, setToken] = useState('');
   const [orgs, setOrgs] = useState<string[]>([]);
@@ -68,46 +71,86 @@ function App() {
 
   // Cache for repository details to avoid redundant API calls
   const repoDetailsCache = useRef<Map<string, TreeNode[]>>(new Map());
+  // After a manual refresh, details are fetched past the server's caches as well
+  const refreshRepoDetails = useRef(false);
+  // Tree load in progress; a newer load aborts it so its callbacks can't overwrite the tree
+  const treeLoad = useRef<AbortController | null>(null);
 
   const versionInfo = getVersionInfo();
   const isDevelopment = ENVIRONMENT === 'development';
   const isProduction = ENVIRONMENT === 'production';
 
-  const loadData = async () => {
+  const loadData = async (refresh = false) => {
+    treeLoad.current?.abort();
+    const controller = new AbortController();
+    treeLoad.current = controller;
+    const { signal } = controller;
+
     if (!token) {
       setError('Please configure your GitHub token in settings');
       setLoading(false);
+      setStreaming(false);
       setSettingsOpen(true);
       return;
     }
 
     try {
       setLoading(true);
+      setStreaming(true);
       setError(null);
-
-      const [tree, rate] = await Promise.all([
-        fetchTree(orgs, token, githubApiUrl),
-        fetchRateLimit(token, githubApiUrl),
-      ]);
+      setOrgErrors([]);
+      if (refresh) {
+        repoDetailsCache.current.clear();
+      }
+      refreshRepoDetails.current = refresh;
 
       // Initialize all orgs and repos as enabled by default
-      const treeWithEnabled = tree.map(org => ({
+      const withEnabled = (org: TreeNode): TreeNode => ({
         ...org,
         enabled: true,
         children: org.children.map(repo => ({
           ...repo,
           enabled: true,
         })),
-      }));
+      });
 
-      setTreeData(treeWithEnabled);
-      setFilteredTreeData(treeWithEnabled); // Initialize filtered data
+      // Render each organization as soon as the server streams it
+      const tree: TreeNode[] = [];
+      const failedOrgs: TreeStreamError[] = [];
+      const [, rate] = await Promise.all([
+        fetchTreeStream(
+          node => {
+            if (signal.aborted) return;
+            tree.push(withEnabled(node));
+            setTreeData([...tree]);
+            setFilteredTreeData([...tree]); // Initialize filtered data
+            setLoading(false);
+          },
+          orgError => {
+            if (signal.aborted) return;
+            failedOrgs.push(orgError);
+            setOrgErrors([...failedOrgs]);
+          },
+          orgs, token, githubApiUrl, refresh, signal
+        ),
+        fetchRateLimit(token, githubApiUrl),
+      ]);
+      if (signal.aborted) return;
+
+      setTreeData(tree);
+      setFilteredTreeData(tree);
       setRateLimit(rate);
     } catch (err) {
+      // A newer load replaced this one; its own state updates take over
+      if (signal.aborted) return;
       setError(err instanceof Error ? err.message : 'Failed to load data');
       console.error('Error loading data:', err);
     } finally {
-      setLoading(false);
+      if (treeLoad.current === controller) {
+        treeLoad.current = null;
+        setLoading(false);
+        setStreaming(false);
+      }
     }
   };
 
@@ -200,7 +243,7 @@ function App() {
     }
 
     try {
-      const children = await fetchRepoDetails(owner, repo, token, githubApiUrl);
+      const children = await fetchRepoDetails(owner, repo, token, githubApiUrl, refreshRepoDetails.current);
       // Cache the result
       repoDetailsCache.current.set(cacheKey, children);
 
@@ -250,7 +293,7 @@ function App() {
     }
 
     try {
-      const children = await fetchRepoDetails(owner, repo, token, githubApiUrl);
+      const children = await fetchRepoDetails(owner, repo, token, githubApiUrl, refreshRepoDetails.current);
       // Cache the result
       repoDetailsCache.current.set(cacheKey, children);
       return children;
@@ -321,7 +364,10 @@ function App() {
         }
       }, 30000);
 
-      return () => clearInterval(interval);
+      return () => {
+        clearInterval(interval);
+        treeLoad.current?.abort();
+      };
     }
   }, [token, orgs, githubApiUrl]);
 
@@ -369,8 +415,8 @@ function App() {
             <Tooltip title="Refresh data">
               <IconButton
                 color="inherit"
-                onClick={loadData}
-                disabled={loading || !token}
+                onClick={() => loadData(true)}
+                disabled={loading || streaming || !token}
                 sx={{ ml: 1 }}
               >
                 <Refresh />
@@ -413,6 +459,12 @@ function App() {
             </Alert>
           )}
 
+          {orgErrors.length > 0 && (
+            <Alert severity="warning" sx={{ mb: 2 }}>
+              {orgErrors.map(orgError => `Failed to load ${orgError.org}: ${orgError.detail}`).join('; ')}
+            </Alert>
+          )}
+
           {!loading && !error && treeData.length === 0 && (
             <Alert severity="info">
               No repositories found. Make sure your GitHub token is configured correctly.
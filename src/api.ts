@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { TreeNode, RateLimitInfo } from './types';
+import type { TreeNode, RateLimitInfo, TreeStreamError } from './types';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
@@ -7,14 +7,51 @@ const api = axios.create({
   baseURL: API_BASE_URL,
 });
 
-export const fetchTree = async (orgs?: string[], token?: string, githubApiUrl?: string): Promise<TreeNode[]> => {
-  const params = orgs && orgs.length > 0 ? { orgs: orgs.join(',') } : {};
-  const headers = {
+// Stream the tree as NDJSON, calling onNode for each organization as soon as it arrives
+// and onError for each organization the server couldn't load; aborting the signal
+// cancels the request and rejects with an AbortError
+export const fetchTreeStream = async (
+  onNode: (node: TreeNode) => void,
+  onError: (error: TreeStreamError) => void,
+  orgs?: string[],
+  token?: string,
+  githubApiUrl?: string,
+  refresh?: boolean,
+  signal?: AbortSignal
+): Promise<void> => {
+  const params = new URLSearchParams({ stream: 'true' });
+  if (orgs && orgs.length > 0) params.set('orgs', orgs.join(','));
+  if (refresh) params.set('refresh', 'true');
+  const headers: Record<string, string> = {
     ...(token && { 'X-GitHub-Token': token }),
     ...(githubApiUrl && { 'X-GitHub-API-URL': githubApiUrl }),
   };
-  const response = await api.get<TreeNode[]>('/api/tree', { params, headers });
-  return response.data;
+
+  const response = await fetch(`${API_BASE_URL}/api/tree?${params}`, { headers, signal });
+  if (!response.ok || !response.body) {
+    throw new Error(`Failed to load tree: ${response.status}`);
+  }
+
+  const handleLine = (line: string) => {
+    const record = JSON.parse(line) as TreeNode | { error: TreeStreamError };
+    if ('error' in record) onError(record.error);
+    else onNode(record);
+  };
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() ?? '';
+    for (const line of lines) {
+      if (line.trim()) handleLine(line);
+    }
+    if (done) break;
+  }
+  if (buffer.trim()) handleLine(buffer);
 };
 
 export const fetchRateLimit = async (token?: string, githubApiUrl?: string): Promise<RateLimitInfo> => {
@@ -30,12 +67,14 @@ export const fetchRepoDetails = async (
   owner: string,
   repo: string,
   token?: string,
-  githubApiUrl?: string
+  githubApiUrl?: string,
+  refresh?: boolean
 ): Promise<TreeNode[]> => {
   const headers = {
     ...(token && { 'X-GitHub-Token': token }),
     ...(githubApiUrl && { 'X-GitHub-API-URL': githubApiUrl }),
   };
-  const response = await api.get<TreeNode[]>(`/api/repo-details/${owner}/${repo}`, { headers });
+  const params = refresh ? { refresh: true } : undefined;
+  const response = await api.get<TreeNode[]>(`/api/repo-details/${owner}/${repo}`, { headers, params });
   return response.data;
 };
@@ -11,6 +11,13 @@ export interface TreeNode {
   enabled?: boolean;      // Indicates if this node is enabled for searching (only for org/repo)
 }
 
+// An organization the streamed tree couldn't load
+export interface TreeStreamError {
+  org: string;
+  status: number;
+  detail: string;
+}
+
 export interface RateLimitInfo {
   limit: number;
   remaining: number;